@@ -1,20 +1,39 @@
 import os
+import time
+import hashlib
 import uuid
-from flask import Flask, render_template, request, send_from_directory, redirect, url_for, flash, jsonify, session
+import logging
+from flask import Flask, Response, g, render_template, request, send_from_directory, redirect, url_for, flash, jsonify, session
+from modules import metrics
+from modules.coalesce import Coalescer
 from modules.extractor import extract_text_from_file
 from modules.lang_detect import detect_language
 from modules.translator import maybe_translate
 from modules.summarizer import maybe_summarize
-from modules.tts import synthesize_speech
-from modules.utils import allowed_file, secure_filename_safe
+from modules.tts import TTS_ENGINE, synthesize_speech
+from modules.utils import ALLOWED_EXTENSIONS, allowed_file, secure_filename_safe, setup_logging
+
+_log_queue = setup_logging(on_drop=lambda: metrics.inc('log_records_dropped_total'))
+if _log_queue is not None:
+    metrics.register_gauge('log_queue_depth', _log_queue.qsize, 'Log records waiting to be written.')
+logger = logging.getLogger(__name__)
+metrics.describe('http_requests_total', 'counter', 'HTTP requests by route, method and status.')
+metrics.describe('http_request_duration_seconds', 'histogram', 'HTTP request latency by route.')
+metrics.describe('http_requests_in_flight', 'gauge', 'Requests currently being handled, by route.')
+
+# Identical concurrent /translate and /generate-audio requests share one provider call
+_translate_flights = Coalescer('translate')
+_audio_flights = Coalescer('audio')
+
+def _text_key(text):
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
 
 app = Flask(__name__)
 app.config['SECRET_KEY'] = os.environ.get("FLASK_SECRET", "devkey")
 app.config['UPLOAD_FOLDER'] = os.path.join(os.path.dirname(__file__), 'uploads')
 app.config['AUDIO_FOLDER'] = os.path.join(os.path.dirname(__file__), 'static', 'audio')
 app.config['MAX_CONTENT_LENGTH'] = 25 * 1024 * 1024  # 25 MB
-
-ALLOWED_EXTENSIONS = {'pdf', 'docx', 'txt', 'png', 'jpg', 'jpeg', 'tiff'}
+os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
 
 @app.route('/', methods=['GET', 'POST'])
 def index():
@@ -82,6 +101,26 @@ def index():
                            target_lang=session.get('target_lang'),
                            audio_url=session.get('audio_url'))
 
+@app.before_request
+def start_request_metrics():
+    g.route = request.url_rule.rule if request.url_rule else 'unmatched'
+    g.started = time.perf_counter()
+    g.trace_token = metrics.start_trace(f"{request.method} {g.route}")
+    metrics.add_gauge('http_requests_in_flight', 1, route=g.route)
+
+@app.after_request
+def record_request_metrics(response):
+    route = g.get('route', 'unmatched')
+    metrics.inc('http_requests_total', route=route, method=request.method, status=response.status_code)
+    metrics.observe('http_request_duration_seconds', time.perf_counter() - g.get('started', time.perf_counter()), route=route)
+    return response
+
+@app.teardown_request
+def end_request_metrics(exc):
+    if 'route' in g:
+        metrics.add_gauge('http_requests_in_flight', -1, route=g.route)
+        metrics.end_trace(g.get('trace_token'), route=g.route)
+
 @app.after_request
 def add_no_cache_headers(response):
     """Prevent browsers/proxies from caching dynamic pages to avoid stale content."""
@@ -109,15 +148,9 @@ def translate():
             text = session.get('original_text', '')
         
         # Debug logging to trace stale content issues
-        try:
-            print("=== Translate Debug ===")
-            print(f"Target lang: {target_lang}")
-            incoming_preview = (text or '')[:120].replace('\n', ' ')
-            session_preview = (session.get('original_text', '') or '')[:120].replace('\n', ' ')
-            print(f"Incoming text[0:120]: {incoming_preview}")
-            print(f"Session original_text[0:120]: {session_preview}")
-        except Exception:
-            pass
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Translate: target=%s incoming[0:120]=%r session[0:120]=%r", target_lang,
+                         (text or '')[:120], (session.get('original_text', '') or '')[:120])
 
         if not text:
             return jsonify({'success': False, 'error': 'No text available to translate'})
@@ -125,7 +158,10 @@ def translate():
             return jsonify({'success': False, 'error': f'Text too long to translate ({len(text)} chars). Try summarizing first.'})
         
         # Perform translation, pass along detected src language if available
-        translated_text = maybe_translate(text, target_lang, session.get('src_lang'))
+        src_lang = session.get('src_lang')
+        translated_text = _translate_flights.run(
+            (_text_key(text), src_lang, target_lang),
+            lambda: maybe_translate(text, target_lang, src_lang))
         
         if translated_text:
             # Store the translated text in session
@@ -147,42 +183,45 @@ def generate_audio():
         text = data.get('text', '')
         target_lang = data.get('target_lang', '')
         
-        print(f"=== Audio Generation Request Debug ===")
-        print(f"Text to convert to audio: {text[:100] if text else 'None'}...")
-        print(f"Target language: {target_lang}")
+        logger.debug("Audio generation: lang=%s text[0:100]=%r", target_lang, (text or '')[:100])
         
         if not text:
             return jsonify({'success': False, 'error': 'No text provided for audio generation'})
         
-        # Generate unique filename for audio
-        unique_id = str(uuid.uuid4())[:8]
-        out_name = f"translated_speech_{unique_id}.mp3"
-        out_path = os.path.join(app.config['AUDIO_FOLDER'], out_name)
-        
-        # Ensure audio folder exists
-        os.makedirs(app.config['AUDIO_FOLDER'], exist_ok=True)
-        
-        # Generate speech using TTS
-        print(f"Generating audio for text length: {len(text)}")
-        print(f"Using language: {target_lang}")
-        ok = synthesize_speech(text, out_path, target_lang)
+        def _synthesize():
+            # Generate unique filename for audio
+            unique_id = str(uuid.uuid4())[:8]
+            out_name = f"translated_speech_{unique_id}.mp3"
+            out_path = os.path.join(app.config['AUDIO_FOLDER'], out_name)
+
+            # Ensure audio folder exists
+            os.makedirs(app.config['AUDIO_FOLDER'], exist_ok=True)
+
+            # Generate speech using TTS
+            return out_name if synthesize_speech(text, out_path, target_lang) else None
+
+        # Concurrent requests for the same text/language share one synthesis and audio file
+        out_name = _audio_flights.run((_text_key(text), target_lang, TTS_ENGINE), _synthesize)
         
-        if ok:
+        if out_name:
             # Store audio URL in session
             audio_url = url_for('static', filename=f'audio/{out_name}')
             session['audio_url'] = audio_url
-            print(f"SUCCESS: Audio generated and stored: {audio_url}")
+            logger.info("Audio generated: %s", audio_url)
             return jsonify({'success': True, 'audio_url': audio_url})
         else:
-            print("ERROR: TTS failed")
+            logger.error("TTS failed")
             return jsonify({'success': False, 'error': 'TTS failed. Check internet connection.'})
             
     except Exception as e:
-        print(f"EXCEPTION in generate_audio route: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("Exception in generate_audio route")
         return jsonify({'success': False, 'error': str(e)})
 
+@app.route('/metrics')
+def metrics_endpoint():
+    """Prometheus scrape endpoint"""
+    return Response(metrics.render_prometheus(), content_type='text/plain; version=0.0.4; charset=utf-8')
+
 @app.route('/static/audio/<path:filename>')
 def serve_audio(filename):
     return send_from_directory(app.config['AUDIO_FOLDER'], filename, as_attachment=False)
@@ -0,0 +1,273 @@
+"""
+Offline batch mode: run the document pipeline over a directory tree without the web app.
+
+Example:
+    python batch.py /data/drop --output results.jsonl --target-lang hi --workers 4
+
+Results are appended as they complete and a manifest of finished file hashes is kept
+next to the output, so re-running the same command after an interruption skips
+documents that were already processed. Only completed documents are written: a file
+whose extraction comes back empty or whose translation fails is reported on stderr,
+left out of the output and the manifest, and retried on the next run. Files with the
+same content as one processed in the same run get their own record with
+`duplicate_of` pointing at the original path.
+"""
+import argparse
+import hashlib
+import json
+import os
+import sys
+import time
+from multiprocessing import Pool
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Set
+
+from modules.extractor import extract_text_from_file
+from modules.lang_detect import detect_language
+from modules.summarizer import maybe_summarize
+from modules.translator import maybe_translate
+from modules.utils import ALLOWED_EXTENSIONS, allowed_file
+
+
+def _file_sha256(path: str) -> str:
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1024 * 1024), b''):
+            h.update(block)
+    return h.hexdigest()
+
+
+def _count_pages(path: str) -> int:
+    """
+    Best-effort page count used for throughput reporting (1 for single-page formats).
+    """
+    ext = Path(path).suffix.lower()
+    try:
+        if ext == '.pdf':
+            from pdfminer.pdfpage import PDFPage
+            with open(path, 'rb') as f:
+                return sum(1 for _ in PDFPage.get_pages(f)) or 1
+        if ext == '.tiff':
+            from PIL import Image
+            with Image.open(path) as img:
+                return getattr(img, 'n_frames', 1)
+    except Exception:
+        pass
+    return 1
+
+
+def _iter_documents(root: str) -> Iterator[str]:
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames.sort()
+        for name in sorted(filenames):
+            if allowed_file(name, ALLOWED_EXTENSIONS):
+                yield os.path.join(dirpath, name)
+
+
+def _process_one(task):
+    path, digest, opts = task
+    started = time.perf_counter()
+    record = {
+        'path': path,
+        'sha256': digest,
+        'pages': _count_pages(path),
+        'src_lang': None,
+        'text': None,
+        'summary': None,
+        'translated_text': None,
+        'target_lang': opts.get('target_lang'),
+        'duplicate_of': None,
+        'error': None,
+    }
+    try:
+        text = extract_text_from_file(path) or ''
+        record['text'] = text
+        if not text.strip():
+            record['error'] = 'no text extracted'
+        else:
+            record['src_lang'] = detect_language(text)
+            text_for_pipeline = text
+            if opts.get('summarize'):
+                record['summary'] = maybe_summarize(text)
+                text_for_pipeline = record['summary'] or text
+            if opts.get('target_lang'):
+                record['translated_text'] = maybe_translate(text_for_pipeline, opts['target_lang'], record['src_lang'])
+                if record['translated_text'] is None:
+                    record['error'] = 'translation failed'
+    except Exception as e:
+        record['error'] = str(e)
+    record['elapsed_sec'] = round(time.perf_counter() - started, 4)
+    return record
+
+
+class _JsonlWriter:
+    def __init__(self, path: str):
+        self._f = open(path, 'a', encoding='utf-8')
+
+    def write(self, record: dict) -> list:
+        self._f.write(json.dumps(record, ensure_ascii=False) + '\n')
+        self._f.flush()
+        os.fsync(self._f.fileno())
+        return [record]
+
+    def close(self) -> list:
+        self._f.close()
+        return []
+
+
+class _ParquetWriter:
+    """
+    Buffers records and writes them as numbered part files inside the output directory.
+    Hashes are only reported as durable once their part file has been written.
+
+    Every part uses the same explicit schema: inferred types would make an all-None column
+    (e.g. duplicate_of in a part without duplicates) `null` in one part and `string` in
+    another, and the directory could no longer be read as one dataset.
+    """
+
+    def __init__(self, path: str, batch_size: int):
+        import pyarrow as pa  # fail early if the optional dependency is missing
+        self._schema = pa.schema([
+            ('path', pa.string()),
+            ('sha256', pa.string()),
+            ('pages', pa.int64()),
+            ('src_lang', pa.string()),
+            ('text', pa.string()),
+            ('summary', pa.string()),
+            ('translated_text', pa.string()),
+            ('target_lang', pa.string()),
+            ('duplicate_of', pa.string()),
+            ('error', pa.string()),
+            ('elapsed_sec', pa.float64()),
+        ])
+        os.makedirs(path, exist_ok=True)
+        self._dir = path
+        self._batch_size = batch_size
+        self._pending: list = []
+        self._part = len([n for n in os.listdir(path) if n.endswith('.parquet')])
+
+    def write(self, record: dict) -> list:
+        self._pending.append(record)
+        if len(self._pending) >= self._batch_size:
+            return self._flush()
+        return []
+
+    def _flush(self) -> list:
+        if not self._pending:
+            return []
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        table = pa.Table.from_pylist(self._pending, schema=self._schema)
+        pq.write_table(table, os.path.join(self._dir, f'part-{self._part:05d}.parquet'))
+        self._part += 1
+        flushed, self._pending = self._pending, []
+        return flushed
+
+    def close(self) -> list:
+        return self._flush()
+
+
+def _load_manifest(path: str) -> Set[str]:
+    if not os.path.exists(path):
+        return set()
+    with open(path, 'r', encoding='utf-8') as f:
+        return {line.strip() for line in f if line.strip()}
+
+
+def run_batch(input_dir: str, output: str, fmt: str = 'jsonl', workers: Optional[int] = None,
+              target_lang: Optional[str] = None, summarize: bool = False,
+              manifest: Optional[str] = None, parquet_batch: int = 100) -> dict:
+    """
+    Process every supported document under `input_dir` and return run statistics.
+    """
+    manifest = manifest or f"{output.rstrip(os.sep)}.manifest"
+    done = _load_manifest(manifest)
+    opts = {'target_lang': target_lang, 'summarize': summarize}
+
+    tasks = []
+    skipped = 0
+    # sha256 -> paths of later files in this run with the same content
+    duplicates: Dict[str, List[str]] = {}
+    for path in _iter_documents(input_dir):
+        digest = _file_sha256(path)
+        if digest in done:
+            skipped += 1
+        elif digest in duplicates:
+            duplicates[digest].append(path)
+        else:
+            duplicates[digest] = []
+            tasks.append((path, digest, opts))
+
+    if fmt == 'parquet':
+        writer = _ParquetWriter(output, parquet_batch)
+    else:
+        out_dir = os.path.dirname(os.path.abspath(output))
+        os.makedirs(out_dir, exist_ok=True)
+        writer = _JsonlWriter(output)
+
+    stats = {'documents': 0, 'pages': 0, 'failed': 0, 'skipped': skipped, 'duplicates': 0}
+    started = time.perf_counter()
+    with open(manifest, 'a', encoding='utf-8') as mf:
+        def _commit(records):
+            for rec in records:
+                if rec['duplicate_of'] is None:
+                    mf.write(rec['sha256'] + '\n')
+            mf.flush()
+            os.fsync(mf.fileno())
+
+        try:
+            with Pool(processes=workers) as pool:
+                for record in pool.imap_unordered(_process_one, tasks, chunksize=1):
+                    dups = duplicates.get(record['sha256'], [])
+                    stats['documents'] += 1
+                    stats['pages'] += record['pages']
+                    if record['error']:
+                        # Not written and not in the manifest, so the next run retries it
+                        stats['failed'] += 1 + len(dups)
+                        for p in [record['path']] + dups:
+                            print(f"FAILED {p}: {record['error']}", file=sys.stderr)
+                        continue
+                    _commit(writer.write(record))
+                    for p in dups:
+                        stats['duplicates'] += 1
+                        _commit(writer.write(dict(record, path=p, duplicate_of=record['path'], elapsed_sec=0.0)))
+        finally:
+            _commit(writer.close())
+
+    elapsed = time.perf_counter() - started
+    stats['elapsed_sec'] = elapsed
+    stats['docs_per_sec'] = stats['documents'] / elapsed if elapsed > 0 else 0.0
+    stats['pages_per_sec'] = stats['pages'] / elapsed if elapsed > 0 else 0.0
+    return stats
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description='Run extract/detect/summarize/translate over a directory tree.')
+    parser.add_argument('input_dir', help='Directory to scan recursively for documents')
+    parser.add_argument('-o', '--output', required=True,
+                        help='Output file (jsonl) or directory of part files (parquet)')
+    parser.add_argument('--format', choices=('jsonl', 'parquet'), default='jsonl')
+    parser.add_argument('-w', '--workers', type=int, default=None, help='Worker processes (default: CPU count)')
+    parser.add_argument('-t', '--target-lang', default=None, help='Translate to this ISO code (e.g. hi, ta)')
+    parser.add_argument('--summarize', action='store_true', help='Summarize long documents before translating')
+    parser.add_argument('--manifest', default=None, help='Manifest of completed hashes (default: <output>.manifest)')
+    parser.add_argument('--parquet-batch', type=int, default=100, help='Records per parquet part file')
+    args = parser.parse_args(argv)
+
+    if not os.path.isdir(args.input_dir):
+        parser.error(f'Not a directory: {args.input_dir}')
+
+    stats = run_batch(args.input_dir, args.output, fmt=args.format, workers=args.workers,
+                      target_lang=(args.target_lang or '').strip().lower() or None,
+                      summarize=args.summarize, manifest=args.manifest,
+                      parquet_batch=args.parquet_batch)
+
+    print(f"Processed {stats['documents']} document(s), {stats['pages']} page(s) "
+          f"in {stats['elapsed_sec']:.2f}s ({stats['failed']} failed, {stats['duplicates']} duplicate(s), "
+          f"{stats['skipped']} already done)")
+    print(f"Throughput: {stats['docs_per_sec']:.2f} documents/sec, {stats['pages_per_sec']:.2f} pages/sec")
+    return 1 if stats['failed'] else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,491 @@
+"""
+End-to-end benchmark over a reproducible synthetic multilingual corpus.
+
+Example:
+    python benchmark.py                                  # run and print a report
+    python benchmark.py --save-baseline bench_baseline.json
+    python benchmark.py --baseline bench_baseline.json   # exit 1 on regressions
+
+The corpus (images, multi-page PDFs and DOCX in Latin, Devanagari and Tamil text at
+several sizes and noise levels) is rendered with PIL from a fixed seed. Scanned PDF/DOCX
+only go through OCR, so they are timed only when Tesseract is installed; text-layer DOCX
+(all scripts) and PDF (Latin only, see _write_text_pdf) time the extractors themselves.
+Translation, summarization and TTS run against in-process stub providers, so no network
+access or model download is needed.
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+import types
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Optional
+
+from PIL import Image, ImageDraw, ImageFont
+
+from modules.extractor import _extract_text_docx, _extract_text_pdf
+from modules.lang_detect import detect_language
+from modules.metrics import percentile
+from modules.ocr import _ocr_with_langs, _preprocess_image
+from modules.summarizer import MIN_CHARS as _SUMMARIZE_MIN_CHARS, maybe_summarize
+from modules.translator import maybe_translate
+from modules.tts import synthesize_speech
+
+_WORDS = {
+    'latin': ['the', 'document', 'reading', 'village', 'school', 'water', 'health', 'market',
+              'weather', 'letter', 'family', 'river', 'farmer', 'notice', 'public', 'service'],
+    'devanagari': ['दस्तावेज़', 'पढ़ना', 'गाँव', 'विद्यालय', 'पानी', 'स्वास्थ्य', 'बाज़ार',
+                   'मौसम', 'पत्र', 'परिवार', 'नदी', 'किसान', 'सूचना', 'सेवा'],
+    'tamil': ['ஆவணம்', 'படித்தல்', 'கிராமம்', 'பள்ளி', 'தண்ணீர்', 'சுகாதாரம்', 'சந்தை',
+              'வானிலை', 'கடிதம்', 'குடும்பம்', 'நதி', 'விவசாயி', 'அறிவிப்பு', 'சேவை'],
+}
+
+# Font files tried per script; override with BENCH_FONT_<SCRIPT>=/path/to/font.ttf
+_FONT_CANDIDATES = {
+    'latin': ['/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf', 'C:\\Windows\\Fonts\\arial.ttf',
+              '/Library/Fonts/Arial Unicode.ttf'],
+    'devanagari': ['/usr/share/fonts/truetype/noto/NotoSansDevanagari-Regular.ttf',
+                   '/usr/share/fonts/truetype/lohit-devanagari/Lohit-Devanagari.ttf',
+                   'C:\\Windows\\Fonts\\Nirmala.ttf', '/Library/Fonts/Arial Unicode.ttf'],
+    'tamil': ['/usr/share/fonts/truetype/noto/NotoSansTamil-Regular.ttf',
+              '/usr/share/fonts/truetype/lohit-tamil/Lohit-Tamil.ttf',
+              'C:\\Windows\\Fonts\\Nirmala.ttf', '/Library/Fonts/Arial Unicode.ttf'],
+}
+
+_SIZES = {'small': (600, 200), 'medium': (1200, 600), 'large': (2400, 1200)}
+_NOISE_LEVELS = (0.0, 0.02, 0.08)
+
+
+def _load_font(script: str, size: int):
+    paths = [os.environ.get(f'BENCH_FONT_{script.upper()}')] + _FONT_CANDIDATES[script]
+    for p in paths:
+        if p and os.path.exists(p):
+            try:
+                return ImageFont.truetype(p, size), True
+            except Exception:
+                continue
+    return ImageFont.load_default(), False
+
+
+def _make_text(rng: random.Random, script: str, n_words: int) -> str:
+    words = [rng.choice(_WORDS[script]) for _ in range(n_words)]
+    lines = [' '.join(words[i:i + 8]) for i in range(0, len(words), 8)]
+    return '\n'.join(lines)
+
+
+def _render_page(rng: random.Random, script: str, size: tuple, noise: float) -> tuple:
+    """
+    Render a page of text the same way test_ocr.py does, plus salt-and-pepper noise.
+    """
+    w, h = size
+    font, real_font = _load_font(script, max(12, h // 14))
+    text = _make_text(rng, script, n_words=max(8, (w * h) // 40000))
+    img = Image.new('RGB', (w, h), color=(255, 255, 255))
+    d = ImageDraw.Draw(img)
+    d.multiline_text((10, 10), text, fill=(0, 0, 0), font=font, spacing=8)
+    if noise:
+        px = img.load()
+        for _ in range(int(w * h * noise)):
+            x, y = rng.randrange(w), rng.randrange(h)
+            px[x, y] = (0, 0, 0) if rng.random() < 0.5 else (255, 255, 255)
+    return img, text, real_font
+
+
+def _write_text_pdf(path: str, pages: List[str]):
+    """
+    Write a minimal PDF with a real text layer, one page per string. PIL only writes image
+    PDFs; this uses the built-in Helvetica font, so it is only meaningful for Latin text.
+    """
+    objects = [b'<< /Type /Catalog /Pages 2 0 R >>', b'',
+               b'<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>']
+    kids = []
+    for text in pages:
+        ops = [b'BT /F1 11 Tf 14 TL 50 800 Td']
+        for line in text.split('\n'):
+            line = line.replace('\\', '\\\\').replace('(', '\\(').replace(')', '\\)')
+            ops.append(b'(' + line.encode('latin-1', 'replace') + b") '")
+        ops.append(b'ET')
+        stream = b'\n'.join(ops)
+        objects.append(b'<< /Length %d >>\nstream\n' % len(stream) + stream + b'\nendstream')
+        objects.append(b'<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] /Contents %d 0 R '
+                       b'/Resources << /Font << /F1 3 0 R >> >> >>' % len(objects))
+        kids.append(len(objects))
+    objects[1] = b'<< /Type /Pages /Kids [%s] /Count %d >>' % (b' '.join(b'%d 0 R' % k for k in kids), len(kids))
+
+    out = bytearray(b'%PDF-1.4\n')
+    offsets = []
+    for num, obj in enumerate(objects, 1):
+        offsets.append(len(out))
+        out += b'%d 0 obj\n' % num + obj + b'\nendobj\n'
+    xref = len(out)
+    out += b'xref\n0 %d\n0000000000 65535 f \n' % (len(objects) + 1)
+    for off in offsets:
+        out += b'%010d 00000 n \n' % off
+    out += b'trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n' % (len(objects) + 1, xref)
+    with open(path, 'wb') as f:
+        f.write(out)
+
+
+def build_corpus(out_dir: str, seed: int = 1234, sizes=('small', 'medium'), pages=(1, 3)) -> List[dict]:
+    """
+    Generate the benchmark corpus under out_dir and return one descriptor per document.
+    """
+    rng = random.Random(seed)
+    docs: List[dict] = []
+    for script in _WORDS:
+        for size_name in sizes:
+            for noise in _NOISE_LEVELS:
+                tag = f"{script}_{size_name}_n{int(noise * 100):02d}"
+                img, text, real_font = _render_page(rng, script, _SIZES[size_name], noise)
+                img_path = os.path.join(out_dir, f'{tag}.png')
+                img.save(img_path)
+                docs.append({'kind': 'image', 'path': img_path, 'script': script, 'text': text,
+                             'pages': 1, 'real_font': real_font})
+
+                for n_pages in pages:
+                    rendered = [_render_page(rng, script, _SIZES[size_name], noise) for _ in range(n_pages)]
+                    page_imgs = [r[0] for r in rendered]
+                    page_text = '\n'.join(r[1] for r in rendered)
+
+                    pdf_path = os.path.join(out_dir, f'{tag}_{n_pages}p.pdf')
+                    page_imgs[0].save(pdf_path, save_all=True, append_images=page_imgs[1:], resolution=150)
+                    docs.append({'kind': 'pdf', 'path': pdf_path, 'script': script, 'text': page_text,
+                                 'pages': n_pages, 'real_font': real_font})
+                    if script == 'latin':
+                        pdf_path = os.path.join(out_dir, f'{tag}_{n_pages}p_text.pdf')
+                        _write_text_pdf(pdf_path, [r[1] for r in rendered])
+                        docs.append({'kind': 'pdf_text', 'path': pdf_path, 'script': script, 'text': page_text,
+                                     'pages': n_pages, 'real_font': True})
+
+                    try:
+                        import docx
+                        from docx.shared import Inches
+                    except Exception:
+                        continue
+                    docx_path = os.path.join(out_dir, f'{tag}_{n_pages}p.docx')
+                    document = docx.Document()
+                    for i, page_img in enumerate(page_imgs):
+                        png_path = os.path.join(out_dir, f'{tag}_{n_pages}p_{i}.png')
+                        page_img.save(png_path)
+                        document.add_picture(png_path, width=Inches(6))
+                        document.add_page_break()
+                    document.save(docx_path)
+                    docs.append({'kind': 'docx', 'path': docx_path, 'script': script, 'text': page_text,
+                                 'pages': n_pages, 'real_font': real_font})
+
+                    docx_path = os.path.join(out_dir, f'{tag}_{n_pages}p_text.docx')
+                    document = docx.Document()
+                    for i, (_, text, _) in enumerate(rendered):
+                        for line in text.split('\n'):
+                            document.add_paragraph(line)
+                        if i < len(rendered) - 1:
+                            document.add_page_break()
+                    document.save(docx_path)
+                    docs.append({'kind': 'docx_text', 'path': docx_path, 'script': script, 'text': page_text,
+                                 'pages': n_pages, 'real_font': True})
+    return docs
+
+
+class _StubTranslator:
+    latency = 0.0
+
+    def __init__(self, source='auto', target='en', **kwargs):
+        self.target = target
+
+    def translate(self, text, **kwargs):
+        if self.latency:
+            time.sleep(self.latency)
+        return f'[{self.target}] {text}'
+
+
+class _StubSummarizer:
+    latency = 0.0
+
+    def __call__(self, text, max_length=150, min_length=0, **kwargs):
+        if self.latency:
+            time.sleep(self.latency)
+        return [{'summary_text': ' '.join(text.split()[:max_length])}]
+
+
+def _stub_pipeline(task, model=None, **kwargs):
+    return _StubSummarizer()
+
+
+class _StubTTS:
+    latency = 0.0
+
+    def __init__(self, text, lang='en', **kwargs):
+        self.text = text
+
+    def save(self, path):
+        if self.latency:
+            time.sleep(self.latency)
+        with open(path, 'wb') as f:
+            f.write(b'ID3' + self.text.encode('utf-8')[:1024])
+
+
+@contextmanager
+def stub_providers(latency: float = 0.0):
+    """
+    Point maybe_translate / maybe_summarize / synthesize_speech at local stubs for the
+    duration of the block. All three import their providers lazily, so patching the provider
+    modules is enough; `transformers` is replaced in sys.modules so the real package (and
+    its model download) is never touched.
+    """
+    import deep_translator
+    import gtts
+    _StubTranslator.latency = latency
+    _StubSummarizer.latency = latency
+    _StubTTS.latency = latency
+    saved = [(deep_translator, name, getattr(deep_translator, name, None))
+             for name in ('GoogleTranslator', 'MyMemoryTranslator', 'LibreTranslator')]
+    saved.append((gtts, 'gTTS', gtts.gTTS))
+    saved_transformers = sys.modules.get('transformers')
+    stub_transformers = types.ModuleType('transformers')
+    stub_transformers.pipeline = _stub_pipeline
+    try:
+        for mod, name, _ in saved[:-1]:
+            setattr(mod, name, _StubTranslator)
+        gtts.gTTS = _StubTTS
+        sys.modules['transformers'] = stub_transformers
+        yield
+    finally:
+        for mod, name, orig in saved:
+            if orig is None:
+                delattr(mod, name)
+            else:
+                setattr(mod, name, orig)
+        if saved_transformers is None:
+            sys.modules.pop('transformers', None)
+        else:
+            sys.modules['transformers'] = saved_transformers
+
+
+def _peak_rss_mb() -> Optional[float]:
+    """
+    Process-wide peak RSS in MB, or None when it cannot be measured on this platform.
+    """
+    try:
+        import resource
+        rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # ru_maxrss is bytes on macOS, kilobytes on Linux
+        return rss / (1024 * 1024) if sys.platform == 'darwin' else rss / 1024
+    except ImportError:
+        pass
+    try:
+        import psutil
+        mem = psutil.Process().memory_info()
+        # peak_wset is the Windows peak working set; fall back to current RSS elsewhere
+        return getattr(mem, 'peak_wset', mem.rss) / (1024 * 1024)
+    except Exception:
+        return None
+
+
+def _time_stage(fn: Callable, inputs: list, repeat: int) -> dict:
+    latencies: List[float] = []
+    units = 0
+    started = time.perf_counter()
+    for _ in range(repeat):
+        for item in inputs:
+            t0 = time.perf_counter()
+            fn(item['arg'])
+            latencies.append(time.perf_counter() - t0)
+            units += item.get('pages', 1)
+    total = time.perf_counter() - started
+    latencies.sort()
+    return {
+        'calls': len(latencies),
+        'total_sec': total,
+        'throughput_per_sec': len(latencies) / total if total > 0 else 0.0,
+        'pages_per_sec': units / total if total > 0 else 0.0,
+        'p50_ms': percentile(latencies, 50) * 1000,
+        'p90_ms': percentile(latencies, 90) * 1000,
+        'p99_ms': percentile(latencies, 99) * 1000,
+        'max_ms': latencies[-1] * 1000 if latencies else 0.0,
+    }
+
+
+def _tesseract_available() -> bool:
+    try:
+        import pytesseract
+        pytesseract.get_tesseract_version()
+        return True
+    except Exception:
+        return False
+
+
+def run_benchmarks(docs: List[dict], repeat: int = 1, stub_latency: float = 0.0,
+                   ocr_langs: Optional[List[str]] = None) -> Dict[str, dict]:
+    def _paths(kind):
+        return [{'arg': d['path'], 'pages': d['pages']} for d in docs if d['kind'] == kind]
+
+    def _long(text):
+        # Always past the summarizer's threshold, so the summarize path is what gets timed
+        return (text + '\n') * (_SUMMARIZE_MIN_CHARS // max(1, len(text) + 1) + 1)
+
+    images = [d for d in docs if d['kind'] == 'image']
+    texts = [{'arg': d['text'], 'pages': d['pages']} for d in docs]
+    long_texts = [{'arg': _long(d['text']), 'pages': d['pages']} for d in docs if d['kind'] == 'pdf']
+    audio_dir = tempfile.mkdtemp(prefix='bench_audio_')
+
+    loaded = [{'arg': Image.open(d['path']).convert('RGB'), 'pages': 1} for d in images]
+    preprocessed = [{'arg': _preprocess_image(i['arg']), 'pages': 1} for i in loaded]
+    langs = ocr_langs or ['eng', 'hin', 'tam']
+
+    stages: Dict[str, tuple] = {
+        '_preprocess_image': (_preprocess_image, loaded),
+    }
+    stages['_extract_text_pdf'] = (_extract_text_pdf, _paths('pdf_text'))
+    if _paths('docx_text'):
+        stages['_extract_text_docx'] = (_extract_text_docx, _paths('docx_text'))
+    # Scanned documents only exercise the OCR fallback; without Tesseract that is a failed call
+    if _tesseract_available():
+        stages['_ocr_with_langs'] = (lambda img: _ocr_with_langs(img, langs), preprocessed)
+        stages['_extract_text_pdf_ocr'] = (_extract_text_pdf, _paths('pdf'))
+        if _paths('docx'):
+            stages['_extract_text_docx_ocr'] = (_extract_text_docx, _paths('docx'))
+    stages['detect_language'] = (detect_language, texts)
+    stages['maybe_summarize'] = (maybe_summarize, long_texts)
+    stages['maybe_translate'] = (lambda t: maybe_translate(t, 'hi'), texts)
+    counter = iter(range(10 ** 9))
+    stages['synthesize_speech'] = (
+        lambda t: synthesize_speech(t, os.path.join(audio_dir, f'{next(counter)}.mp3'), 'en'), texts)
+
+    results: Dict[str, dict] = {}
+    with stub_providers(stub_latency):
+        for name, (fn, inputs) in stages.items():
+            print(f'  timing {name} ({len(inputs)} input(s) x {repeat})...', file=sys.stderr)
+            results[name] = _time_stage(fn, inputs, repeat)
+    return results
+
+
+def compare_to_baseline(results: Dict[str, dict], baseline: Dict[str, dict],
+                        tolerance: float, min_delta_ms: float) -> List[str]:
+    """
+    Return a message for every stage whose p50 or p90 latency regressed beyond tolerance.
+    """
+    regressions = []
+    for stage, cur in results.items():
+        base = baseline.get(stage)
+        if not base:
+            continue
+        for key in ('p50_ms', 'p90_ms'):
+            before, after = base.get(key, 0.0), cur[key]
+            if after > before * (1 + tolerance) and (after - before) > min_delta_ms:
+                regressions.append(f'{stage} {key}: {before:.2f} -> {after:.2f} ms '
+                                   f'(+{(after / before - 1) * 100 if before else float("inf"):.0f}%)')
+    return regressions
+
+
+# Run parameters (and environment facts that decide which stages run or what they
+# measure) that must match for a baseline comparison to be meaningful
+_BASELINE_PARAMS = ('seed', 'sizes', 'pages', 'repeat', 'stub_latency', 'tesseract', 'fonts')
+
+
+def _baseline_mismatches(params: dict, saved: dict) -> List[str]:
+    return [f'{k}: baseline={saved.get(k)!r} run={params[k]!r}'
+            for k in _BASELINE_PARAMS if saved.get(k) != params[k]]
+
+
+def _print_report(results: Dict[str, dict], baseline: Optional[Dict[str, dict]]):
+    header = f"{'stage':<24} {'calls':>6} {'ops/s':>9} {'pages/s':>9} {'p50 ms':>9} {'p90 ms':>9} {'p99 ms':>9}"
+    if baseline:
+        header += f" {'p50 vs base':>12}"
+    print(header)
+    print('-' * len(header))
+    for stage, r in results.items():
+        line = (f"{stage:<24} {r['calls']:>6} {r['throughput_per_sec']:>9.1f} {r['pages_per_sec']:>9.1f} "
+                f"{r['p50_ms']:>9.2f} {r['p90_ms']:>9.2f} {r['p99_ms']:>9.2f}")
+        if baseline:
+            base = baseline.get(stage, {}).get('p50_ms')
+            line += f" {((r['p50_ms'] / base - 1) * 100):>+11.0f}%" if base else f" {'n/a':>12}"
+        print(line)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description='Benchmark the document pipeline on a synthetic corpus.')
+    parser.add_argument('--seed', type=int, default=1234)
+    parser.add_argument('--sizes', default='small,medium', help=f"Comma list of {', '.join(_SIZES)}")
+    parser.add_argument('--pages', default='1,3', help='Comma list of page counts for PDF/DOCX documents')
+    parser.add_argument('--repeat', type=int, default=3, help='Timed passes over each stage input')
+    parser.add_argument('--stub-latency', type=float, default=0.0, help='Seconds of simulated provider latency')
+    parser.add_argument('--corpus-dir', default=None, help='Keep the generated corpus here (default: temp dir)')
+    parser.add_argument('--baseline', default=None, help='Compare against this saved baseline JSON')
+    parser.add_argument('--save-baseline', default=None, help='Write results to this baseline JSON')
+    parser.add_argument('--tolerance', type=float, default=0.25, help='Allowed relative slowdown (0.25 = 25%%)')
+    parser.add_argument('--min-delta-ms', type=float, default=1.0, help='Ignore slowdowns smaller than this')
+    parser.add_argument('--json', default=None, help='Also write the full report to this JSON file')
+    args = parser.parse_args(argv)
+
+    sizes = [s.strip() for s in args.sizes.split(',') if s.strip()]
+    unknown = [s for s in sizes if s not in _SIZES]
+    if unknown:
+        parser.error(f'Unknown size(s): {", ".join(unknown)}')
+    pages = [int(p) for p in args.pages.split(',') if p.strip()]
+    tesseract = _tesseract_available()
+    fonts = {script: _load_font(script, 12)[1] for script in _WORDS}
+    params = {'seed': args.seed, 'sizes': sizes, 'pages': pages, 'repeat': args.repeat,
+              'stub_latency': args.stub_latency, 'tesseract': tesseract, 'fonts': fonts}
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            saved = json.load(f)
+        mismatches = _baseline_mismatches(params, saved)
+        if mismatches:
+            parser.error('baseline was recorded with different settings ('
+                         + '; '.join(mismatches) + '); re-run with matching options or save a new baseline')
+        baseline = saved.get('stages', {})
+
+    corpus_dir = args.corpus_dir or tempfile.mkdtemp(prefix='bench_corpus_')
+    os.makedirs(corpus_dir, exist_ok=True)
+    print(f'Building corpus in {corpus_dir} (seed={args.seed})...', file=sys.stderr)
+    docs = build_corpus(corpus_dir, seed=args.seed, sizes=sizes, pages=pages)
+    missing_fonts = sorted(script for script, found in fonts.items() if not found)
+    if missing_fonts:
+        print(f"WARNING: no TrueType font found for {', '.join(missing_fonts)}; "
+              f"set BENCH_FONT_<SCRIPT> for realistic glyphs", file=sys.stderr)
+    if not tesseract:
+        print('WARNING: tesseract not found; skipping _ocr_with_langs and the scanned PDF/DOCX stages',
+              file=sys.stderr)
+
+    results = run_benchmarks(docs, repeat=args.repeat, stub_latency=args.stub_latency)
+
+    _print_report(results, baseline)
+    report = {
+        'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': platform.python_version(),
+        'machine': platform.platform(),
+        **params,
+        'documents': len(docs),
+        'peak_rss_mb': _peak_rss_mb(),
+        'stages': results,
+    }
+    # ru_maxrss is a process-wide high-water mark (corpus generation included), so it is
+    # reported once for the run rather than per stage
+    peak = report['peak_rss_mb']
+    print(f"\nPeak RSS for the run: {f'{peak:.1f} MB' if peak is not None else 'n/a'} "
+          f"over {len(docs)} generated document(s)")
+
+    for path in (args.json, args.save_baseline):
+        if path:
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump(report, f, indent=2)
+
+    if baseline is not None:
+        regressions = compare_to_baseline(results, baseline, args.tolerance, args.min_delta_ms)
+        if regressions:
+            print('\nPERFORMANCE REGRESSIONS:')
+            for r in regressions:
+                print(f'  {r}')
+            return 1
+        print('\nNo regressions against baseline.')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,399 @@
+"""
+Local load test: stand-in translation/TTS servers plus concurrent traffic against app.py.
+
+Example:
+    python loadtest.py --concurrency 16 --requests 400
+    python loadtest.py --profile google=latency:0.3,jitter:0.1,error_rate:0.2,status:429
+
+    # Separately started app: run the stand-ins in one terminal...
+    python loadtest.py --serve-only --stub-port 8901
+    # ...start app.py with the printed TRANSLATE_*_URL / GTTS_URL exported, then drive it;
+    # --stub-port here only reads the running stand-ins' hit counts, it starts nothing
+    python loadtest.py --target http://127.0.0.1:5000 --stub-port 8901
+
+Stand-ins replace Google Translate, MyMemory, LibreTranslate and the gTTS API; the app is
+pointed at them through TRANSLATE_GOOGLE_URL, TRANSLATE_MYMEMORY_URL, TRANSLATE_LIBRE_URL
+(with a placeholder LIBRE_API_KEY, which enables the Libre fallback) and GTTS_URL. Each stand-in has its own latency/error profile, so provider fallbacks and
+retries can be exercised without touching the real services.
+"""
+import argparse
+import base64
+import json
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List
+
+from modules.metrics import percentile
+
+_SERVICES = ('google', 'mymemory', 'libre', 'gtts')
+_ENV_FOR_SERVICE = {
+    'google': 'TRANSLATE_GOOGLE_URL',
+    'mymemory': 'TRANSLATE_MYMEMORY_URL',
+    'libre': 'TRANSLATE_LIBRE_URL',
+    'gtts': 'GTTS_URL',
+}
+# LibreTranslate is only tried when a key is set; the stand-in accepts any key
+_STUB_LIBRE_API_KEY = 'loadtest'
+# A few bytes that start like an MP3 (ID3 header); enough for file-size checks in tts.py
+_FAKE_MP3 = b'ID3\x04\x00\x00\x00\x00\x00\x00' + b'\x00' * 512
+
+_WORDS = ['village', 'school', 'water', 'health', 'market', 'weather', 'letter', 'family',
+          'river', 'farmer', 'notice', 'public', 'service', 'doctor', 'bus', 'ration']
+
+
+class Profile:
+    """Latency and error behaviour of one stand-in service."""
+
+    def __init__(self, latency: float = 0.05, jitter: float = 0.02, error_rate: float = 0.0, status: int = 503):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.status = status
+
+    @classmethod
+    def parse(cls, spec: str) -> 'Profile':
+        """Parse 'latency:0.2,jitter:0.05,error_rate:0.1,status:429'."""
+        kwargs = {}
+        for part in filter(None, (p.strip() for p in spec.split(','))):
+            key, _, value = part.partition(':')
+            if key not in ('latency', 'jitter', 'error_rate', 'status'):
+                raise ValueError(f'Unknown profile key: {key}')
+            kwargs[key] = int(value) if key == 'status' else float(value)
+        return cls(**kwargs)
+
+    def __repr__(self):
+        return (f'latency={self.latency}s jitter={self.jitter}s '
+                f'error_rate={self.error_rate:.0%} status={self.status}')
+
+
+def _make_handler(service: str, profile: Profile, hits: Dict[str, int], lock: threading.Lock):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def log_message(self, fmt, *args):
+            pass
+
+        def _reply(self, status: int, body: bytes, content_type: str):
+            self.send_response(status)
+            self.send_header('Content-Type', content_type)
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def _simulate(self) -> bool:
+            with lock:
+                hits[service] = hits.get(service, 0) + 1
+            delay = max(0.0, random.gauss(profile.latency, profile.jitter)) if profile.jitter else profile.latency
+            time.sleep(delay)
+            if profile.error_rate and random.random() < profile.error_rate:
+                with lock:
+                    hits[f'{service}_errors'] = hits.get(f'{service}_errors', 0) + 1
+                self._reply(profile.status, b'simulated failure', 'text/plain')
+                return False
+            return True
+
+        def do_GET(self):
+            if self.path == '/_stats':
+                with lock:
+                    body = json.dumps(hits).encode('utf-8')
+                self._reply(200, body, 'application/json')
+                return
+            params = urllib.parse.parse_qs(urllib.parse.urlparse(self.path).query)
+            text = params.get('q', [''])[0]
+            if not self._simulate():
+                return
+            if service == 'google':
+                target = params.get('tl', ['?'])[0]
+                body = f'<html><body><div class="result-container">[{target}] {text}</div></body></html>'
+                self._reply(200, body.encode('utf-8'), 'text/html; charset=utf-8')
+            elif service == 'mymemory':
+                target = params.get('langpair', ['?|?'])[0].split('|')[-1]
+                payload = {'responseData': {'translatedText': f'[{target}] {text}'}, 'matches': []}
+                self._reply(200, json.dumps(payload).encode('utf-8'), 'application/json')
+            else:
+                self._reply(404, b'not found', 'text/plain')
+
+        def do_POST(self):
+            length = int(self.headers.get('Content-Length') or 0)
+            raw = self.rfile.read(length) if length else b''
+            if not self._simulate():
+                return
+            if service == 'libre':
+                # deep-translator sends the fields as query parameters; other clients post JSON or a form
+                data = dict(urllib.parse.parse_qsl(urllib.parse.urlparse(self.path).query))
+                try:
+                    data.update(json.loads(raw or b'{}'))
+                except ValueError:
+                    data.update(urllib.parse.parse_qsl(raw.decode('utf-8', 'ignore')))
+                payload = {'translatedText': f"[{data.get('target', '?')}] {data.get('q', '')}"}
+                self._reply(200, json.dumps(payload).encode('utf-8'), 'application/json')
+            elif service == 'gtts':
+                # Same framing as the batchexecute endpoint gTTS parses (see gtts.tts.gTTS.stream)
+                audio = base64.b64encode(_FAKE_MP3).decode('ascii')
+                body = ')]}\'\n\n[["wrb.fr","jQ1olc","[\\"%s\\"]",null,null,null,"generic"]]\n' % audio
+                self._reply(200, body.encode('utf-8'), 'application/json; charset=utf-8')
+            else:
+                self._reply(404, b'not found', 'text/plain')
+
+    return Handler
+
+
+def start_stub_servers(profiles: Dict[str, Profile], host: str = '127.0.0.1', base_port: int = 0):
+    """
+    Start one threaded stand-in server per service (on base_port + i, or ephemeral ports
+    when base_port is 0). Returns (servers, urls, hit counters).
+    """
+    servers = []
+    urls: Dict[str, str] = {}
+    hits: Dict[str, int] = {}
+    lock = threading.Lock()
+    for i, service in enumerate(_SERVICES):
+        port = base_port + i if base_port else 0
+        server = ThreadingHTTPServer((host, port), _make_handler(service, profiles[service], hits, lock))
+        server.daemon_threads = True
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        # Libre is configured with the server root; the client appends 'translate' itself
+        path = {'google': '/m', 'mymemory': '/get', 'libre': '/',
+                'gtts': '/_/TranslateWebserverUi/data/batchexecute'}[service]
+        urls[service] = f'http://{host}:{server.server_address[1]}{path}'
+        servers.append(server)
+    return servers, urls, hits
+
+
+def start_app(host: str = '127.0.0.1') -> tuple:
+    """
+    Serve app.py in-process on an ephemeral port, with uploads and audio in a temp dir.
+    """
+    import logging
+    from werkzeug.serving import make_server
+    from app import app
+
+    # Per-request access lines would dominate the output; the report covers them
+    logging.getLogger('werkzeug').setLevel(logging.WARNING)
+
+    work = tempfile.mkdtemp(prefix='loadtest_')
+    app.config['UPLOAD_FOLDER'] = os.path.join(work, 'uploads')
+    app.config['AUDIO_FOLDER'] = os.path.join(work, 'audio')
+    os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
+    server = make_server(host, 0, app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f'http://{host}:{server.server_port}'
+
+
+def _make_text(rng: random.Random, n_words: int) -> str:
+    sentences = []
+    for _ in range(max(1, n_words // 10)):
+        sentences.append(' '.join(rng.choice(_WORDS) for _ in range(10)).capitalize() + '.')
+    return ' '.join(sentences)
+
+
+def _multipart(fields: Dict[str, str], filename: str, content: bytes) -> tuple:
+    boundary = uuid.uuid4().hex
+    parts = []
+    for name, value in fields.items():
+        parts.append(f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"\r\n\r\n{value}\r\n'.encode())
+    parts.append(f'--{boundary}\r\nContent-Disposition: form-data; name="file"; filename="{filename}"\r\n'
+                 f'Content-Type: text/plain\r\n\r\n'.encode() + content + b'\r\n')
+    parts.append(f'--{boundary}--\r\n'.encode())
+    return b''.join(parts), f'multipart/form-data; boundary={boundary}'
+
+
+class _NoRedirect(urllib.request.HTTPRedirectHandler):
+    """Surface redirects as HTTPError: the upload route redirects only on failure (flash + redirect)."""
+
+    def redirect_request(self, req, fp, code, msg, headers, newurl):
+        return None
+
+
+_opener = urllib.request.build_opener(_NoRedirect)
+
+
+def _send(base: str, route: str, body: bytes, content_type: str, timeout: float) -> tuple:
+    req = urllib.request.Request(base + route, data=body, headers={'Content-Type': content_type}, method='POST')
+    start = time.perf_counter()
+    try:
+        with _opener.open(req, timeout=timeout) as rsp:
+            payload = rsp.read()
+            ok = rsp.status == 200
+            if ok and rsp.headers.get_content_type() == 'application/json':
+                ok = bool(json.loads(payload or b'{}').get('success'))
+    except (urllib.error.URLError, OSError, ValueError):
+        ok = False
+    return route, ok, time.perf_counter() - start
+
+
+def _request_factory(scenario: str, texts: List[str], target_langs: List[str], rng: random.Random):
+    def upload():
+        body, ctype = _multipart({}, 'loadtest.txt', rng.choice(texts).encode('utf-8'))
+        return '/', body, ctype
+
+    def translate():
+        payload = {'text': rng.choice(texts), 'target_lang': rng.choice(target_langs)}
+        return '/translate', json.dumps(payload).encode('utf-8'), 'application/json'
+
+    def audio():
+        payload = {'text': rng.choice(texts), 'target_lang': rng.choice(target_langs)}
+        return '/generate-audio', json.dumps(payload).encode('utf-8'), 'application/json'
+
+    if scenario == 'upload':
+        return upload
+    if scenario == 'translate':
+        return translate
+    if scenario == 'audio':
+        return audio
+    weighted = [upload] + [translate] * 2 + [audio] * 2
+    return lambda: rng.choice(weighted)()
+
+
+def run_load(base: str, scenario: str, n_requests: int, concurrency: int, texts: List[str],
+             target_langs: List[str], seed: int, timeout: float) -> tuple:
+    rng = random.Random(seed)
+    make = _request_factory(scenario, texts, target_langs, rng)
+    planned = [make() for _ in range(n_requests)]
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(lambda r: _send(base, r[0], r[1], r[2], timeout), planned))
+    return results, time.perf_counter() - started
+
+
+def _report(results: list, elapsed: float):
+    by_route: Dict[str, list] = {}
+    for route, ok, latency in results:
+        by_route.setdefault(route, []).append((ok, latency))
+    header = f"{'route':<16} {'reqs':>6} {'errors':>7} {'req/s':>8} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'max ms':>9}"
+    print(header)
+    print('-' * len(header))
+    for route in sorted(by_route):
+        rows = by_route[route]
+        lat = sorted(l for _, l in rows)
+        errors = sum(1 for ok, _ in rows if not ok)
+        print(f"{route:<16} {len(rows):>6} {errors:>7} {len(rows) / elapsed:>8.1f} "
+              f"{percentile(lat, 50) * 1000:>9.1f} {percentile(lat, 95) * 1000:>9.1f} "
+              f"{percentile(lat, 99) * 1000:>9.1f} {lat[-1] * 1000:>9.1f}")
+    total_errors = sum(1 for _, ok, _ in results if not ok)
+    print(f"\n{len(results)} request(s) in {elapsed:.2f}s: {len(results) / elapsed:.1f} req/s, {total_errors} error(s)")
+
+
+def fetch_stub_hits(host: str, base_port: int) -> Dict[str, int]:
+    """
+    Read hit counters from stand-ins started by another loadtest.py process (--serve-only).
+    """
+    try:
+        with urllib.request.urlopen(f'http://{host}:{base_port}/_stats', timeout=5) as rsp:
+            return json.loads(rsp.read() or b'{}')
+    except (urllib.error.URLError, OSError, ValueError):
+        return {}
+
+
+def _print_app_counters(base: str):
+    try:
+        with urllib.request.urlopen(base + '/metrics', timeout=5) as rsp:
+            text = rsp.read().decode('utf-8')
+    except (urllib.error.URLError, OSError):
+        return
+    wanted = ('translations_total', 'translation_retries_total', 'stage_errors_total', 'coalesced_requests_total')
+    lines = [l for l in text.splitlines() if l.startswith(wanted)]
+    if lines:
+        print('\nApp counters:')
+        for line in lines:
+            print(f'  {line}')
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description='Load-test app.py against local translation/TTS stand-ins.')
+    parser.add_argument('--scenario', choices=('upload', 'translate', 'audio', 'mixed'), default='mixed')
+    parser.add_argument('-n', '--requests', type=int, default=200)
+    parser.add_argument('-c', '--concurrency', type=int, default=8)
+    parser.add_argument('--profile', action='append', default=[], metavar='SERVICE=SPEC',
+                        help=f"Per-service profile, SERVICE in {', '.join(_SERVICES)}; "
+                             "SPEC like latency:0.2,jitter:0.05,error_rate:0.1,status:429")
+    parser.add_argument('--distinct-texts', type=int, default=50, help='Size of the request text pool')
+    parser.add_argument('--words', type=int, default=60, help='Words per generated text')
+    parser.add_argument('--target-langs', default='hi,ta,es', help='Comma list of target languages')
+    parser.add_argument('--target', default=None,
+                        help='Base URL of an already running app; no stand-ins are started (default: '
+                             'start the app and stand-ins in-process)')
+    parser.add_argument('--serve-only', action='store_true', help='Only run the stand-ins and print their env vars')
+    parser.add_argument('--stub-port', type=int, default=0,
+                        help='First port for the stand-ins (one per service); default: ephemeral. '
+                             'With --target, where to read stand-in hit counts from')
+    parser.add_argument('--timeout', type=float, default=60.0)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args(argv)
+
+    profiles = {s: Profile() for s in _SERVICES}
+    for item in args.profile:
+        service, _, spec = item.partition('=')
+        if service not in profiles:
+            parser.error(f'Unknown service in --profile: {service}')
+        try:
+            profiles[service] = Profile.parse(spec)
+        except ValueError as e:
+            parser.error(str(e))
+
+    if args.serve_only and args.target:
+        parser.error('--serve-only and --target are separate steps; run them as two commands')
+    if args.target and args.profile:
+        parser.error('--profile applies where the stand-ins run; pass it with --serve-only')
+
+    servers = []
+    hits: Dict[str, int] = {}
+    if not args.target:
+        servers, urls, hits = start_stub_servers(profiles, base_port=args.stub_port)
+        for service, url in urls.items():
+            os.environ[_ENV_FOR_SERVICE[service]] = url
+            print(f'{_ENV_FOR_SERVICE[service]}={url}  ({profiles[service]})', file=sys.stderr)
+        os.environ['LIBRE_API_KEY'] = _STUB_LIBRE_API_KEY
+        print(f'LIBRE_API_KEY={_STUB_LIBRE_API_KEY}', file=sys.stderr)
+
+    if args.serve_only:
+        print('Stand-ins running; export the variables above for the app. Ctrl-C to stop.', file=sys.stderr)
+        try:
+            while True:
+                time.sleep(3600)
+        except KeyboardInterrupt:
+            return 0
+
+    app_server = None
+    base = args.target
+    if not base:
+        os.environ.setdefault('LOG_LEVEL', 'WARNING')
+        app_server, base = start_app()
+    base = base.rstrip('/')
+
+    rng = random.Random(args.seed)
+    texts = [_make_text(rng, args.words) for _ in range(max(1, args.distinct_texts))]
+    target_langs = [t.strip() for t in args.target_langs.split(',') if t.strip()]
+
+    remote_before = fetch_stub_hits('127.0.0.1', args.stub_port) if args.target and args.stub_port else {}
+    print(f'Running {args.requests} {args.scenario} request(s) at concurrency {args.concurrency} against {base}...',
+          file=sys.stderr)
+    results, elapsed = run_load(base, args.scenario, args.requests, args.concurrency, texts,
+                                target_langs, args.seed, args.timeout)
+    _report(results, elapsed)
+    if args.target and args.stub_port:
+        after = fetch_stub_hits('127.0.0.1', args.stub_port)
+        hits = {k: v - remote_before.get(k, 0) for k, v in after.items()}
+    if hits:
+        print('\nStand-in hits: ' + ', '.join(f'{k}={v}' for k, v in sorted(hits.items())))
+    _print_app_counters(base)
+
+    if app_server is not None:
+        app_server.shutdown()
+    for server in servers:
+        server.shutdown()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,77 @@
+"""
+In-flight request coalescing: concurrent calls with the same key share one computation.
+"""
+from typing import Any, Callable, Dict, Hashable
+import copy
+import threading
+
+from .metrics import describe, inc
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error = None
+        self.traceback = None
+
+
+def _follower_error(call: _Call) -> BaseException:
+    """
+    A copy of the leader's exception for one follower. Raising the shared object from
+    several threads would make each of them append its frames to the same __traceback__.
+    Falls back to the shared object for exception types that cannot be copied.
+    """
+    error = call.error
+    try:
+        own = copy.copy(error)
+    except Exception:
+        return error.with_traceback(call.traceback)
+    own.__cause__ = error.__cause__
+    own.__context__ = error.__context__
+    own.__suppress_context__ = error.__suppress_context__
+    return own.with_traceback(call.traceback)
+
+
+class Coalescer:
+    """
+    Runs `fn` once per key at a time. Callers that arrive while a call for the same key
+    is in progress wait for it and receive its result (or exception). Nothing is cached
+    once the call finishes; the next caller starts a fresh computation.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, _Call] = {}
+
+    def run(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+
+        if not leader:
+            inc('coalesced_requests_total', kind=self.name)
+            call.done.wait()
+            if call.error is not None:
+                raise _follower_error(call)
+            return call.result
+
+        try:
+            call.result = fn()
+            return call.result
+        except BaseException as e:
+            # BaseException too: a leader interrupted by KeyboardInterrupt/SystemExit must not
+            # leave followers returning a None result as if the call had succeeded
+            call.error = e
+            call.traceback = e.__traceback__
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+
+describe('coalesced_requests_total', 'counter', 'Requests that shared an identical in-flight computation.')
@@ -3,6 +3,8 @@ from pathlib import Path
 from io import BytesIO
 from PIL import Image
 
+from .metrics import timed
+
 def _extract_text_pdf(path):
     # First try text-based PDF extraction; if it fails, fallback to OCR via modules.ocr
     try:
@@ -65,6 +67,10 @@ def _extract_text_image(path):
 
 def extract_text_from_file(path):
     ext = Path(path).suffix.lower()
+    with timed('extract', ext=ext.lstrip('.') or 'none'):
+        return _extract_by_ext(path, ext)
+
+def _extract_by_ext(path, ext):
     if ext == '.pdf':
         return _extract_text_pdf(path)
     elif ext == '.docx':
@@ -1,6 +1,9 @@
+from .metrics import timed
+
 def detect_language(text: str):
     try:
         from langdetect import detect
-        return detect(text)
+        with timed('detect'):
+            return detect(text)
     except Exception:
         return ""
@@ -0,0 +1,200 @@
+"""
+In-process counters, gauges and stage timers, rendered in Prometheus text format.
+
+Stage timings are also recorded into the current request trace when tracing is
+sampled in (TRACE_SAMPLE_RATE, 0.0 - 1.0, default off).
+"""
+from typing import Callable, Dict, List, Optional, Tuple
+import contextvars
+import logging
+import math
+import os
+import random
+import threading
+import time
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+_lock = threading.Lock()
+_counters: Dict[Tuple[str, tuple], float] = {}
+_gauges: Dict[Tuple[str, tuple], float] = {}
+_gauge_callbacks: Dict[str, Callable[[], float]] = {}
+_histograms: Dict[Tuple[str, tuple], list] = {}
+_help: Dict[str, Tuple[str, str]] = {}
+
+_current_trace: contextvars.ContextVar = contextvars.ContextVar('current_trace', default=None)
+
+
+def _key(name: str, labels: dict) -> Tuple[str, tuple]:
+    return name, tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def describe(name: str, kind: str, text: str) -> None:
+    _help[name] = (kind, text)
+
+
+def inc(name: str, value: float = 1.0, **labels) -> None:
+    k = _key(name, labels)
+    with _lock:
+        _counters[k] = _counters.get(k, 0.0) + value
+
+
+def set_gauge(name: str, value: float, **labels) -> None:
+    with _lock:
+        _gauges[_key(name, labels)] = value
+
+
+def add_gauge(name: str, delta: float, **labels) -> None:
+    k = _key(name, labels)
+    with _lock:
+        _gauges[k] = _gauges.get(k, 0.0) + delta
+
+
+def register_gauge(name: str, fn: Callable[[], float], text: str = '') -> None:
+    """
+    Register a gauge whose value is read from `fn` at scrape time (e.g. a queue size).
+    """
+    _gauge_callbacks[name] = fn
+    describe(name, 'gauge', text)
+
+
+def observe(name: str, seconds: float, **labels) -> None:
+    k = _key(name, labels)
+    with _lock:
+        h = _histograms.get(k)
+        if h is None:
+            # [bucket counts..., sum, count]
+            h = _histograms[k] = [0] * len(_BUCKETS) + [0.0, 0]
+        for i, bound in enumerate(_BUCKETS):
+            if seconds <= bound:
+                h[i] += 1
+        h[-2] += seconds
+        h[-1] += 1
+
+
+@contextmanager
+def timed(stage: str, **labels):
+    """
+    Time a pipeline stage: records stage_duration_seconds, counts failures in
+    stage_errors_total and adds a span to the sampled trace, if any.
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    except Exception:
+        inc('stage_errors_total', stage=stage, **labels)
+        raise
+    finally:
+        elapsed = time.perf_counter() - start
+        observe('stage_duration_seconds', elapsed, stage=stage, **labels)
+        trace = _current_trace.get()
+        if trace is not None:
+            trace['spans'].append((stage, labels, start - trace['start'], elapsed))
+
+
+def start_trace(name: str, sample_rate: Optional[float] = None):
+    """
+    Begin a trace for the current context if it is sampled in. Returns a token for end_trace.
+    """
+    if sample_rate is None:
+        try:
+            sample_rate = float(os.environ.get('TRACE_SAMPLE_RATE', '0') or 0)
+        except ValueError:
+            sample_rate = 0.0
+    if sample_rate <= 0 or random.random() >= sample_rate:
+        return None
+    return _current_trace.set({'name': name, 'start': time.perf_counter(), 'spans': []})
+
+
+def end_trace(token, **attrs) -> None:
+    if token is None:
+        return
+    trace = _current_trace.get()
+    _current_trace.reset(token)
+    if trace is None:
+        return
+    total = time.perf_counter() - trace['start']
+    spans = []
+    for stage, lbl, offset, dur in trace['spans']:
+        if lbl:
+            stage += '{' + ','.join(f'{k}={v}' for k, v in lbl.items()) + '}'
+        spans.append(f'{stage}@{offset * 1000:.1f}ms+{dur * 1000:.1f}ms')
+    extra = ' '.join(f'{k}={v}' for k, v in attrs.items())
+    logger.info("trace %s %s total=%.1fms spans=[%s]", trace['name'], extra, total * 1000, ', '.join(spans))
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """
+    Nearest-rank percentile of an already sorted list (0.0 for an empty list).
+    """
+    if not sorted_values:
+        return 0.0
+    k = max(0, min(len(sorted_values) - 1, math.ceil(pct / 100.0 * len(sorted_values)) - 1))
+    return sorted_values[k]
+
+
+def _escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _fmt_labels(labels: tuple, extra: Optional[List[Tuple[str, str]]] = None) -> str:
+    items = list(labels) + (extra or [])
+    if not items:
+        return ''
+    return '{' + ','.join(f'{k}="{_escape(v)}"' for k, v in items) + '}'
+
+
+def _fmt_value(v: float) -> str:
+    return str(int(v)) if float(v).is_integer() else repr(float(v))
+
+
+def render_prometheus() -> str:
+    """
+    Render all metrics in the Prometheus text exposition format (version 0.0.4).
+    """
+    with _lock:
+        counters = dict(_counters)
+        gauges = dict(_gauges)
+        histograms = {k: list(v) for k, v in _histograms.items()}
+    for name, fn in list(_gauge_callbacks.items()):
+        try:
+            gauges[(name, ())] = float(fn())
+        except Exception:
+            continue
+
+    lines: List[str] = []
+
+    def _header(name: str, kind: str):
+        text = _help.get(name, (kind, ''))[1]
+        if text:
+            lines.append(f'# HELP {name} {text}')
+        lines.append(f'# TYPE {name} {kind}')
+
+    for kind, series in (('counter', counters), ('gauge', gauges)):
+        for name in sorted({n for n, _ in series}):
+            _header(name, kind)
+            for (n, labels), value in sorted(series.items()):
+                if n == name:
+                    lines.append(f'{name}{_fmt_labels(labels)} {_fmt_value(value)}')
+
+    for name in sorted({n for n, _ in histograms}):
+        _header(name, 'histogram')
+        for (n, labels), h in sorted(histograms.items()):
+            if n != name:
+                continue
+            for bound, count in zip(_BUCKETS, h):
+                lines.append(f'{name}_bucket{_fmt_labels(labels, [("le", repr(bound))])} {count}')
+            lines.append(f'{name}_bucket{_fmt_labels(labels, [("le", "+Inf")])} {h[-1]}')
+            lines.append(f'{name}_sum{_fmt_labels(labels)} {repr(h[-2])}')
+            lines.append(f'{name}_count{_fmt_labels(labels)} {h[-1]}')
+    return '\n'.join(lines) + '\n'
+
+
+describe('stage_duration_seconds', 'histogram', 'Time spent in each pipeline stage.')
+describe('stage_errors_total', 'counter', 'Pipeline stages that raised an exception.')
+describe('translations_total', 'counter', 'Translations by the provider that produced the result (none = failed).')
+describe('translation_retries_total', 'counter', 'Chunk retries per translation provider.')
+describe('log_records_dropped_total', 'counter', 'Log records dropped because the log queue was full.')
@@ -4,6 +4,8 @@ import tempfile
 import os
 import re
 
+from .metrics import timed
+
 def _preprocess_image(img: Image.Image) -> Image.Image:
     gray = ImageOps.grayscale(img)
     gray = gray.filter(ImageFilter.MedianFilter(size=3))
@@ -73,7 +75,8 @@ def _ocr_with_langs(img: Image.Image, langs: list[str]) -> str:
     best_score = float('-inf')
     for lang in langs:
         try:
-            txt = pytesseract.image_to_string(img, lang=lang, config='--oem 3 --psm 6') or ""
+            with timed('ocr_pass', lang=lang):
+                txt = pytesseract.image_to_string(img, lang=lang, config='--oem 3 --psm 6') or ""
             ltxt = txt.strip()
             score = _score_text_for_lang(ltxt, lang)
             if score > best_score:
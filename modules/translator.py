@@ -1,6 +1,13 @@
 from typing import Optional, List
+import logging
+import os
 import re
 
+from .lang_detect import detect_language
+from .metrics import inc, timed
+
+logger = logging.getLogger(__name__)
+
 def _split_text_into_chunks(text: str, max_chars: int = 3800) -> List[str]:
     """
     Split text into chunks not exceeding max_chars, preferably on sentence boundaries.
@@ -36,27 +43,104 @@ def _split_text_into_chunks(text: str, max_chars: int = 3800) -> List[str]:
     return chunks
 
 
+# Optional endpoint overrides (e.g. local stand-ins for load testing, see loadtest.py)
+_ENDPOINT_ENV = {
+    'google': 'TRANSLATE_GOOGLE_URL',
+    'mymemory': 'TRANSLATE_MYMEMORY_URL',
+}
+
+
+def _make_translator(cls, provider: str, **kwargs):
+    translator = cls(**kwargs)
+    url = os.environ.get(_ENDPOINT_ENV[provider])
+    if url:
+        translator._base_url = url
+    return translator
+
+
+def _provider_lang(languages: dict, lang: str) -> Optional[str]:
+    """
+    Map an ISO code as returned by langdetect ('hi', 'zh-cn') to a code the provider
+    accepts ('hi-IN', 'zh-CN' for MyMemory), or None if it has no such language.
+    """
+    lang = (lang or '').strip().lower()
+    if not lang or lang == 'auto':
+        return None
+    by_lower = {code.lower(): code for code in languages.values()}
+    base = lang.split('-')[0]
+    for candidate in (lang, f'{base}-{base}', base):
+        if candidate in by_lower:
+            return by_lower[candidate]
+    for code in languages.values():
+        if code.lower().split('-')[0] == base:
+            return code
+    return None
+
+
+def _make_mymemory(source_lang: str, target_lang: str):
+    """
+    MyMemory needs an explicit, region-qualified pair ('en-GB|hi-IN'); it has no 'auto' source.
+    """
+    from deep_translator import MyMemoryTranslator
+    from deep_translator.constants import MY_MEMORY_LANGUAGES_TO_CODES
+    src = _provider_lang(MY_MEMORY_LANGUAGES_TO_CODES, source_lang)
+    tgt = _provider_lang(MY_MEMORY_LANGUAGES_TO_CODES, target_lang)
+    if not src or not tgt:
+        raise ValueError(f"no MyMemory language pair for {source_lang or '?'}->{target_lang}")
+    return _make_translator(MyMemoryTranslator, 'mymemory', source=src, target=tgt)
+
+
+def _make_libre(source_lang: str, target_lang: str):
+    """
+    LibreTranslate needs an API key (LIBRE_API_KEY) and an explicit source language. The
+    server defaults to the public instance; TRANSLATE_LIBRE_URL points it elsewhere.
+    Returns None when no key is configured.
+    """
+    api_key = os.environ.get('LIBRE_API_KEY')
+    if not api_key:
+        return None
+    from deep_translator import LibreTranslator
+    from deep_translator.constants import LIBRE_LANGUAGES_TO_CODES
+    src = _provider_lang(LIBRE_LANGUAGES_TO_CODES, source_lang)
+    tgt = _provider_lang(LIBRE_LANGUAGES_TO_CODES, target_lang)
+    if not src or not tgt:
+        raise ValueError(f"no LibreTranslate language pair for {source_lang or '?'}->{target_lang}")
+    url = os.environ.get('TRANSLATE_LIBRE_URL')
+    if url and not url.endswith('/'):
+        # deep-translator appends the 'translate' route to the server URL
+        url += '/'
+    return LibreTranslator(source=src, target=tgt, api_key=api_key, use_free_api=False, custom_url=url or None)
+
+
+def _translate_chunk(translator, provider: str, chunk: str) -> str:
+    with timed('translate_chunk', provider=provider):
+        return translator.translate(chunk)
+
+
 def maybe_translate(text: str, target_lang: str, source_lang: Optional[str] = None) -> Optional[str]:
     """
     Try to translate `text` to `target_lang` using deep-translator.
     Returns translated text, or None on failure.
     """
     if not text or not text.strip():
-        print("ERROR: Empty or None text provided")
+        logger.error("Empty or None text provided")
         return None
-        
+    with timed('translate'):
+        result, provider = _translate_with_fallbacks(text, target_lang, source_lang)
+    inc('translations_total', provider=provider or 'none')
+    return result
+
+
+def _translate_with_fallbacks(text: str, target_lang: str, source_lang: Optional[str]):
+    """
+    Run the provider fallback chain. Returns (translated text or None, provider name or None).
+    """
     try:
-        from deep_translator import GoogleTranslator, MyMemoryTranslator
-        try:
-            # LibreTranslate is optional; not all versions include it
-            from deep_translator import LibreTranslateTranslator  # type: ignore
-            has_libre = True
-        except Exception:
-            LibreTranslateTranslator = None  # type: ignore
-            has_libre = False
+        from deep_translator import GoogleTranslator
+        # LibreTranslate is optional; it is only tried when an API key is configured
+        has_libre = bool(os.environ.get('LIBRE_API_KEY'))
 
-        print(f"Translating to {target_lang} using Google Translate")
-        print(f"Input text length: {len(text)}")
+        logger.info("Translating to %s (%d chars)", target_lang, len(text))
 
         # Sanitize input (remove control chars that can confuse providers)
         text = re.sub(r"[\u200B-\u200F\u202A-\u202E]", "", text)
@@ -64,7 +148,7 @@ def maybe_translate(text: str, target_lang: str, source_lang: Optional[str] = No
         
         # Prepare chunked text to stay under provider limits (~5000). Start ~1800 to be safer for Indic scripts.
         chunks = _split_text_into_chunks(text, max_chars=1800)
-        print(f"Translating in {len(chunks)} chunk(s)")
+        logger.debug("Translating in %d chunk(s)", len(chunks))
 
         # Prefer provider auto-detection first; detected source only as secondary hint
         src = 'auto'
@@ -73,13 +157,15 @@ def maybe_translate(text: str, target_lang: str, source_lang: Optional[str] = No
         # First attempt: Google Translate (chunked)
         google_results: List[str] = []
         try:
-            g_translator = GoogleTranslator(source=src, target=target_lang)
+            g_translator = _make_translator(GoogleTranslator, 'google', source=src, target=target_lang)
             for idx, chunk in enumerate(chunks):
                 last_err = None
                 for attempt in range(2):
                     try:
-                        translated = g_translator.translate(chunk)
-                        print(f"Google chunk {idx+1}/{len(chunks)} try {attempt+1}: {translated[:80] if translated else 'None'}...")
+                        if attempt:
+                            inc('translation_retries_total', provider='google')
+                        translated = _translate_chunk(g_translator, 'google', chunk)
+                        logger.debug("Google chunk %d/%d try %d: %.80s", idx + 1, len(chunks), attempt + 1, translated)
                         if translated:
                             google_results.append(translated)
                             break
@@ -89,23 +175,28 @@ def maybe_translate(text: str, target_lang: str, source_lang: Optional[str] = No
                     raise ValueError(f"Google failed for chunk {idx+1}: {last_err}")
             combined = '\n'.join(google_results)
             if combined.strip() and (src == target_lang or combined.strip() != text.strip()):
-                print("Google translation successful (combined)")
-                return combined
-            print("Google returned empty/unchanged after combining; will try fallback")
+                logger.info("Google translation successful")
+                return combined, 'google'
+            logger.warning("Google returned empty/unchanged after combining; will try fallback")
         except Exception as ge:
-            print(f"GoogleTranslator error: {ge}; will try fallback")
+            logger.warning("GoogleTranslator error: %s; will try fallback", ge)
+
+        # MyMemory and LibreTranslate have no 'auto' source; detect one if the caller gave none
+        fallback_src = detected_src or detect_language(text)
 
         # Fallback attempt: MyMemory (chunked)
         try:
-            print("Trying fallback: MyMemoryTranslator")
+            logger.info("Trying fallback: MyMemoryTranslator")
             mm_results: List[str] = []
-            mm = MyMemoryTranslator(source=src, target=target_lang)
+            mm = _make_mymemory(fallback_src, target_lang)
             for idx, chunk in enumerate(chunks):
                 last_err = None
                 for attempt in range(2):
                     try:
-                        translated_mm = mm.translate(chunk)
-                        print(f"MyMemory chunk {idx+1}/{len(chunks)} try {attempt+1}: {translated_mm[:80] if translated_mm else 'None'}...")
+                        if attempt:
+                            inc('translation_retries_total', provider='mymemory')
+                        translated_mm = _translate_chunk(mm, 'mymemory', chunk)
+                        logger.debug("MyMemory chunk %d/%d try %d: %.80s", idx + 1, len(chunks), attempt + 1, translated_mm)
                         if translated_mm:
                             mm_results.append(translated_mm)
                             break
@@ -115,25 +206,25 @@ def maybe_translate(text: str, target_lang: str, source_lang: Optional[str] = No
                     raise ValueError(f"MyMemory failed for chunk {idx+1}: {last_err}")
             combined_mm = '\n'.join(mm_results)
             if combined_mm.strip() and (src == target_lang or combined_mm.strip() != text.strip()):
-                print("MyMemory translation successful (combined)")
-                return combined_mm
+                logger.info("MyMemory translation successful")
+                return combined_mm, 'mymemory'
         except Exception as me:
-            print(f"MyMemoryTranslator error: {me}")
+            logger.warning("MyMemoryTranslator error: %s", me)
 
         # Fallback attempt: LibreTranslate (if available)
-        if has_libre and LibreTranslateTranslator is not None:
+        if has_libre:
             try:
-                print("Trying fallback: LibreTranslateTranslator")
+                logger.info("Trying fallback: LibreTranslator")
                 lt_results: List[str] = []
-                # Use a public endpoint; for production, host your own
-                lt = LibreTranslateTranslator(source=src, target=target_lang, 
-                                              api_url="https://libretranslate.de/translate")
+                lt = _make_libre(fallback_src, target_lang)
                 for idx, chunk in enumerate(chunks):
                     last_err = None
                     for attempt in range(2):
                         try:
-                            translated_lt = lt.translate(chunk)
-                            print(f"LibreTranslate chunk {idx+1}/{len(chunks)} try {attempt+1}: {translated_lt[:80] if translated_lt else 'None'}...")
+                            if attempt:
+                                inc('translation_retries_total', provider='libre')
+                            translated_lt = _translate_chunk(lt, 'libre', chunk)
+                            logger.debug("LibreTranslate chunk %d/%d try %d: %.80s", idx + 1, len(chunks), attempt + 1, translated_lt)
                             if translated_lt:
                                 lt_results.append(translated_lt)
                                 break
@@ -143,79 +234,77 @@ def maybe_translate(text: str, target_lang: str, source_lang: Optional[str] = No
                         raise ValueError(f"LibreTranslate failed for chunk {idx+1}: {last_err}")
                 combined_lt = '\n'.join(lt_results)
                 if combined_lt.strip() and (src == target_lang or combined_lt.strip() != text.strip()):
-                    print("LibreTranslate translation successful (combined)")
-                    return combined_lt
+                    logger.info("LibreTranslate translation successful")
+                    return combined_lt, 'libre'
             except Exception as le:
-                print(f"LibreTranslateTranslator error: {le}")
+                logger.warning("LibreTranslator error: %s", le)
 
         # Second pass with smaller chunks if all failed
         small_chunks = _split_text_into_chunks(text, max_chars=800)
         if len(small_chunks) > len(chunks):
-            print(f"Retrying with smaller chunks: {len(small_chunks)}")
+            logger.info("Retrying with smaller chunks: %d", len(small_chunks))
             for provider in ('google', 'mymemory', 'libre'):
                 results: List[str] = []
                 try:
                     if provider == 'google':
-                        g = GoogleTranslator(source=src, target=target_lang)
+                        g = _make_translator(GoogleTranslator, 'google', source=src, target=target_lang)
                         for idx, ch in enumerate(small_chunks):
-                            results.append(g.translate(ch) or '')
+                            results.append(_translate_chunk(g, 'google', ch) or '')
                     elif provider == 'mymemory':
-                        m = MyMemoryTranslator(source=src, target=target_lang)
+                        m = _make_mymemory(fallback_src, target_lang)
                         for idx, ch in enumerate(small_chunks):
-                            results.append(m.translate(ch) or '')
-                    elif provider == 'libre' and has_libre and LibreTranslateTranslator is not None:
-                        l = LibreTranslateTranslator(source=src, target=target_lang, api_url="https://libretranslate.de/translate")
+                            results.append(_translate_chunk(m, 'mymemory', ch) or '')
+                    elif provider == 'libre' and has_libre:
+                        l = _make_libre(fallback_src, target_lang)
                         for idx, ch in enumerate(small_chunks):
-                            results.append(l.translate(ch) or '')
+                            results.append(_translate_chunk(l, 'libre', ch) or '')
                     combined_small = '\n'.join(results).strip()
                     if combined_small and (src == target_lang or combined_small != text.strip()):
-                        print(f"Second-pass {provider} successful")
-                        return combined_small
+                        logger.info("Second-pass %s successful", provider)
+                        return combined_small, provider
                 except Exception as e:
-                    print(f"Second-pass {provider} error: {e}")
+                    logger.warning("Second-pass %s error: %s", provider, e)
 
         # Pivot fallback: source -> en -> target (helps when direct pair fails)
         try:
             if target_lang != 'en':
-                print("Trying pivot translation via English")
+                logger.info("Trying pivot translation via English")
                 # First hop to English
-                g1 = GoogleTranslator(source=src, target='en')
+                g1 = _make_translator(GoogleTranslator, 'google', source=src, target='en')
                 to_en_chunks: List[str] = []
                 for ch in chunks:
-                    to_en_chunks.append(g1.translate(ch) or ch)
+                    to_en_chunks.append(_translate_chunk(g1, 'google_pivot', ch) or ch)
                 mid_text = '\n'.join(to_en_chunks)
                 # Second hop English to target
-                g2 = GoogleTranslator(source='en', target=target_lang)
+                g2 = _make_translator(GoogleTranslator, 'google', source='en', target=target_lang)
                 final_chunks: List[str] = []
                 for ch in _split_text_into_chunks(mid_text, max_chars=1800):
-                    final_chunks.append(g2.translate(ch) or ch)
+                    final_chunks.append(_translate_chunk(g2, 'google_pivot', ch) or ch)
                 pivot_result = '\n'.join(final_chunks).strip()
                 if pivot_result and pivot_result != text.strip():
-                    print("Pivot translation successful")
-                    return pivot_result
+                    logger.info("Pivot translation successful")
+                    return pivot_result, 'google_pivot'
         except Exception as pe:
-            print(f"Pivot translation error: {pe}")
+            logger.warning("Pivot translation error: %s", pe)
 
         # Final attempt using detected source explicitly if available
         if detected_src and detected_src != 'auto':
             try:
-                print(f"Final attempt with detected source: {detected_src}")
-                g = GoogleTranslator(source=detected_src, target=target_lang)
+                logger.info("Final attempt with detected source: %s", detected_src)
+                g = _make_translator(GoogleTranslator, 'google', source=detected_src, target=target_lang)
                 res = []
                 for ch in chunks:
-                    res.append(g.translate(ch) or '')
+                    res.append(_translate_chunk(g, 'google_detected', ch) or '')
                 final = '\n'.join(res).strip()
                 if final and final != text.strip():
-                    print("Final attempt successful")
-                    return final
+                    logger.info("Final attempt successful")
+                    return final, 'google_detected'
             except Exception as fe:
-                print(f"Final attempt error: {fe}")
+                logger.warning("Final attempt error: %s", fe)
 
-        print("All translators failed or returned empty/unchanged text")
-        return None
+        logger.error("All translators failed or returned empty/unchanged text")
+        return None, None
 
-    except Exception as e:
-        print(f"Translator module error: {e}")
-        import traceback
-        traceback.print_exc()
-        return None
+    except Exception:
+        logger.exception("Translator module error")
+        return None, None
@@ -1,13 +1,39 @@
 from typing import Optional
+import logging
 import os
 
+from .metrics import timed
+
+logger = logging.getLogger(__name__)
+
+# Identifies the engine behind synthesize_speech (e.g. in request coalescing keys)
+TTS_ENGINE = 'gtts'
+
+def _make_gtts(gTTS, text: str, lang: str):
+    """
+    Build the gTTS engine. If GTTS_URL is set, its API requests are sent there instead
+    of Google (e.g. a local stand-in, see loadtest.py).
+    """
+    url = os.environ.get('GTTS_URL')
+    if not url:
+        return gTTS(text=text, lang=lang)
+
+    class _RedirectedGTTS(gTTS):
+        def _prepare_requests(self):
+            prepared = super()._prepare_requests()
+            for pr in prepared:
+                pr.prepare_url(url, None)
+            return prepared
+
+    return _RedirectedGTTS(text=text, lang=lang)
+
 def synthesize_speech(text: str, out_path: str, lang: str = 'en') -> bool:
     """
     Default: gTTS (requires internet). Saves MP3. Returns True/False.
     Swap engine as needed.
     """
     if not text or not text.strip():
-        print("TTS Error: No text provided")
+        logger.error("TTS: No text provided")
         return False
     
     try:
@@ -31,22 +57,21 @@ def synthesize_speech(text: str, out_path: str, lang: str = 'en') -> bool:
         
         # Use mapped language or default to English
         tts_lang = lang_mapping.get(lang, 'en')
-        print(f"TTS: Using language '{tts_lang}' for input '{lang}'")
+        logger.debug("TTS: Using language '%s' for input '%s'", tts_lang, lang)
         
-        tts = gTTS(text=text, lang=tts_lang)
-        os.makedirs(os.path.dirname(out_path), exist_ok=True)
-        tts.save(out_path)
+        with timed('tts', lang=tts_lang):
+            tts = _make_gtts(gTTS, text, tts_lang)
+            os.makedirs(os.path.dirname(out_path), exist_ok=True)
+            tts.save(out_path)
         
         # Verify file was created
         if os.path.exists(out_path) and os.path.getsize(out_path) > 0:
-            print(f"TTS: Audio file created successfully at {out_path}")
+            logger.info("TTS: Audio file created at %s", out_path)
             return True
         else:
-            print(f"TTS: Audio file creation failed or file is empty")
+            logger.error("TTS: Audio file creation failed or file is empty")
             return False
             
-    except Exception as e:
-        print(f"TTS Error: {e}")
-        import traceback
-        traceback.print_exc()
+    except Exception:
+        logger.exception("TTS Error")
         return False
@@ -1,7 +1,13 @@
+import atexit
+import logging
+import logging.handlers
 import os
+import queue
 import re
 from werkzeug.utils import secure_filename
 
+ALLOWED_EXTENSIONS = {'pdf', 'docx', 'txt', 'png', 'jpg', 'jpeg', 'tiff'}
+
 def allowed_file(filename, allowed_extensions):
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in allowed_extensions
 
@@ -12,3 +18,48 @@ def secure_filename_safe(filename):
         filename = "upload"
     # truncate to avoid very long names
     return filename[:120]
+
+
+class _DroppingQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that drops records instead of blocking when the queue is full."""
+
+    def __init__(self, q, on_drop=None):
+        super().__init__(q)
+        self._on_drop = on_drop
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            if self._on_drop:
+                self._on_drop()
+
+
+_log_listener = None
+_log_queue = None
+
+
+def setup_logging(level=None, max_queue=10000, on_drop=None):
+    """
+    Route all logging through a bounded queue drained by a background thread, so
+    request threads never wait on stdout. Level defaults to $LOG_LEVEL or INFO.
+    Returns the queue so callers can export its depth, or None if the host process
+    already configured the root logger (its handlers are left alone). Safe to call
+    more than once.
+    """
+    global _log_listener, _log_queue
+    if _log_listener is not None:
+        return _log_queue
+    root = logging.getLogger()
+    if root.handlers:
+        return None
+    level = level or os.environ.get('LOG_LEVEL', 'INFO').upper()
+    _log_queue = queue.Queue(maxsize=max_queue)
+    stream = logging.StreamHandler()
+    stream.setFormatter(logging.Formatter('%(asctime)s %(levelname)s %(name)s: %(message)s'))
+    _log_listener = logging.handlers.QueueListener(_log_queue, stream, respect_handler_level=True)
+    _log_listener.start()
+    atexit.register(_log_listener.stop)
+    root.addHandler(_DroppingQueueHandler(_log_queue, on_drop))
+    root.setLevel(level)
+    return _log_queue
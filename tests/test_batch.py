@@ -0,0 +1,81 @@
+import json
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from batch import run_batch
+
+
+def _write(path, text):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(text)
+
+
+def _records(path):
+    with open(path, encoding='utf-8') as f:
+        return [json.loads(line) for line in f]
+
+
+def test_resume_skips_completed_and_retries_failed(tmp_path):
+    src = tmp_path / 'in'
+    _write(str(src / 'a.txt'), 'This is a plain english document about the weather today.')
+    _write(str(src / 'empty.txt'), '   ')
+    out = str(tmp_path / 'out.jsonl')
+
+    first = run_batch(str(src), out, workers=1)
+    assert first['documents'] == 2
+    assert first['failed'] == 1
+    rows = _records(out)
+    assert [os.path.basename(r['path']) for r in rows] == ['a.txt']
+    with open(out + '.manifest', encoding='utf-8') as f:
+        assert [line.strip() for line in f] == [rows[0]['sha256']]
+
+    second = run_batch(str(src), out, workers=1)
+    assert second['skipped'] == 1
+    # The failed document is retried, and still not written
+    assert second['documents'] == 1
+    assert second['failed'] == 1
+    assert len(_records(out)) == 1
+
+
+def test_in_run_duplicates_get_their_own_record(tmp_path):
+    src = tmp_path / 'in'
+    text = 'Ceci est un document en français sur le temps qu il fait.'
+    _write(str(src / 'a.txt'), text)
+    _write(str(src / 'sub' / 'dup.txt'), text)
+    out = str(tmp_path / 'out.jsonl')
+
+    stats = run_batch(str(src), out, workers=1)
+    assert stats['documents'] == 1
+    assert stats['duplicates'] == 1
+    assert stats['skipped'] == 0
+    rows = {os.path.basename(r['path']): r for r in _records(out)}
+    assert rows['a.txt']['duplicate_of'] is None
+    assert rows['dup.txt']['duplicate_of'] == rows['a.txt']['path']
+    assert rows['dup.txt']['text'] == rows['a.txt']['text']
+    with open(out + '.manifest', encoding='utf-8') as f:
+        assert len(f.read().split()) == 1
+
+
+def test_parquet_parts_share_one_schema(tmp_path):
+    pq = pytest.importorskip('pyarrow.parquet')
+    src = tmp_path / 'in'
+    _write(str(src / 'a.txt'), 'This is a plain english document about the weather today.')
+    _write(str(src / 'b.txt'), 'Another plain english document, this one about the river.')
+    _write(str(src / 'sub' / 'dup.txt'), 'Another plain english document, this one about the river.')
+    out = str(tmp_path / 'out')
+
+    # One record per part: parts without a duplicate have an all-None duplicate_of column
+    stats = run_batch(str(src), out, fmt='parquet', workers=1, parquet_batch=1)
+    assert stats['documents'] == 2
+    assert stats['duplicates'] == 1
+    assert len([n for n in os.listdir(out) if n.endswith('.parquet')]) == 3
+
+    rows = {os.path.basename(r['path']): r for r in pq.read_table(out).to_pylist()}
+    assert sorted(rows) == ['a.txt', 'b.txt', 'dup.txt']
+    assert rows['a.txt']['duplicate_of'] is None
+    assert rows['dup.txt']['duplicate_of'] == rows['b.txt']['path']
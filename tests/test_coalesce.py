@@ -0,0 +1,113 @@
+import os
+import sys
+import threading
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from modules import metrics
+from modules.coalesce import Coalescer
+
+
+def _coalesced(kind):
+    return metrics._counters.get(metrics._key('coalesced_requests_total', {'kind': kind}), 0.0)
+
+
+def _run_concurrently(coalescer, n, fn):
+    """
+    Start `n` callers for the same key while the leader is held inside `fn`, then release it.
+    Returns (results, errors) indexed by caller.
+    """
+    release = threading.Event()
+    calls = []
+    results = [None] * n
+    errors = [None] * n
+
+    def leader_fn():
+        calls.append(1)
+        release.wait(5)
+        return fn()
+
+    def caller(i):
+        try:
+            results[i] = coalescer.run('same-key', leader_fn)
+        except BaseException as e:
+            errors[i] = e
+
+    threads = [threading.Thread(target=caller, args=(i,)) for i in range(n)]
+    for t in threads:
+        t.start()
+    # Let every follower register before the leader finishes
+    for _ in range(500):
+        if _coalesced(coalescer.name) >= n - 1:
+            break
+        threading.Event().wait(0.01)
+    release.set()
+    for t in threads:
+        t.join(5)
+    return calls, results, errors
+
+
+def test_concurrent_callers_share_one_call():
+    n = 8
+    coalescer = Coalescer('test-result')
+    before = _coalesced('test-result')
+    calls, results, errors = _run_concurrently(coalescer, n, lambda: 'done')
+    assert len(calls) == 1
+    assert results == ['done'] * n
+    assert errors == [None] * n
+    assert _coalesced('test-result') - before == n - 1
+
+
+def test_leader_exception_reaches_every_caller():
+    n = 5
+    coalescer = Coalescer('test-error')
+
+    def boom():
+        raise ValueError('provider down')
+
+    calls, results, errors = _run_concurrently(coalescer, n, boom)
+    assert len(calls) == 1
+    assert all(isinstance(e, ValueError) for e in errors)
+
+
+def test_leader_base_exception_reaches_followers():
+    n = 3
+    coalescer = Coalescer('test-interrupt')
+
+    def interrupted():
+        raise KeyboardInterrupt
+
+    calls, results, errors = _run_concurrently(coalescer, n, interrupted)
+    assert len(calls) == 1
+    assert all(isinstance(e, KeyboardInterrupt) for e in errors)
+
+
+def test_key_is_released_after_the_call():
+    coalescer = Coalescer('test-release')
+    assert coalescer.run('k', lambda: 1) == 1
+    assert coalescer.run('k', lambda: 2) == 2
+    with pytest.raises(RuntimeError):
+        coalescer.run('k', lambda: (_ for _ in ()).throw(RuntimeError('x')))
+    assert coalescer.run('k', lambda: 3) == 3
+
+
+def test_followers_get_their_own_exception_and_traceback():
+    import traceback
+
+    n = 4
+    coalescer = Coalescer('test-traceback')
+
+    def boom():
+        raise ValueError('provider down')
+
+    calls, results, errors = _run_concurrently(coalescer, n, boom)
+    assert len({id(e) for e in errors}) == n
+    assert all(str(e) == 'provider down' for e in errors)
+    # Every follower sees the leader's frames plus its own, not the frames of the others
+    depths = sorted(len(traceback.extract_tb(e.__traceback__)) for e in errors)
+    leader_depth = depths[0]
+    assert depths[1:] == [depths[1]] * (n - 1)
+    assert depths[1] > leader_depth
+    assert all(any(f.name == 'boom' for f in traceback.extract_tb(e.__traceback__)) for e in errors)